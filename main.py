@@ -1,22 +1,28 @@
 import asyncio
+import html
 import logging
 import os
-import random
+import re
+import signal
 import sqlite3
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
-from urllib.parse import urljoin, urlparse
-
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-from flask import Flask, request, Response
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+import httpx
+from lxml import etree, html as lxml_html
+from aiohttp import web
 from telegram import BotCommand, Update
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 from telegram.ext import Application, CommandHandler, ContextTypes
 
-# Инициализация Flask
-flask_app = Flask(__name__)
+# fastfeedparser (на lxml) заметно быстрее; при его отсутствии — стандартный feedparser
+try:
+    import fastfeedparser as feedparser
+except ImportError:
+    import feedparser
 
 # ========================
 # НАСТРОЙКИ
@@ -28,7 +34,12 @@ PORT = int(os.getenv("PORT", 8443))  # Render задаёт PORT, fallback на 8
 
 CHECK_INTERVAL_SECONDS = 60 * 60  # Проверка каждые 60 минут
 DB_PATH = "posted.db"
+POSTED_RETENTION_DAYS = 90  # Сколько дней хранить опубликованные URL
+DB_SCHEMA_VERSION = 2  # 2 — таблица posted хранится как WITHOUT ROWID
 REQUEST_TIMEOUT = 15
+OG_MAX_BYTES = 256 * 1024  # Дальше этого объёма <head> не ищем
+OG_CACHE_SIZE = 1024
+OG_CACHE_TTL_DAYS = 7  # Сколько дней доверять сохранённому og:image
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
@@ -40,6 +51,11 @@ POLITICAL_KEYWORDS = [
     "война", "конфликт", "дипломатия", "внешняя политика", "геополитика", "парламент", 
     "депутат", "кремль", "белый дом", "угрозы", "международные отношения"
 ]
+# Все ключевые слова одним регулярным выражением — один проход по заголовку
+POLITICAL_RE = re.compile("|".join(re.escape(k) for k in POLITICAL_KEYWORDS), re.IGNORECASE)
+
+# HTML-теги в анонсах RSS
+TAG_RE = re.compile(r"<[^>]+>")
 
 SOURCES = [
     {"name": "TourDom", "rss": "https://www.tourdom.ru/news/rss/", "html": "https://www.tourdom.ru/news/"},
@@ -49,83 +65,195 @@ SOURCES = [
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger("newsbot")
 
-session = requests.Session()
-session.headers.update({"User-Agent": USER_AGENT})
+# Общий асинхронный HTTP-клиент: пул keep-alive соединений и HTTP/2
+client = httpx.AsyncClient(
+    http2=True,
+    headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate, br"},
+    timeout=REQUEST_TIMEOUT,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+)
+
+# Кэш условных GET-запросов: url -> {"etag", "last_modified", "data"}
+http_cache: Dict[str, Dict[str, Any]] = {}
+
+# Кэш og:image: url -> картинка (или None, если её нет на странице)
+og_image_cache: Dict[str, Optional[str]] = {}
+
+# Единое соединение с SQLite на весь процесс (autocommit, WAL); доступ — под блокировкой
+db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+db_lock = threading.Lock()
+for pragma in (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=60000",
+):
+    db.execute(pragma)
+
+# Курсор для вставок, переиспользуемый между вызовами mark_posted
+posted_insert = db.cursor()
 
-# Глобальная переменная для приложения PTB
+# Копия столбца posted.url в памяти: проверки дубликатов обходятся без запросов к SQLite
+posted_urls: Set[str] = set()
+
+# Глобальные переменные для приложения PTB и HTTP-сервера
 app = None
+web_runner: Optional[web.AppRunner] = None
 
 # Маршрут для корневого URL, чтобы UptimeRobot и браузер не получали 404
-@flask_app.route('/')
-def home():
+async def home(request: web.Request) -> web.Response:
     logger.info("Received request to root URL")
-    return "Travel bot is alive!", 200
+    return web.Response(text="Travel bot is alive!")
 
 # Маршрут для обработки вебхука Telegram
-@flask_app.route('/webhook', methods=['POST'])
-async def webhook():
-    global app
+async def webhook(request: web.Request) -> web.Response:
     logger.info("Received webhook request")
     if not app:
         logger.error("Application not initialized")
-        return Response("Bot not initialized", status=503)
+        return web.Response(text="Bot not initialized", status=503)
     try:
-        update = Update.de_json(request.get_json(force=True), app.bot)
+        update = Update.de_json(await request.json(), app.bot)
         if update:
             logger.info(f"Processing update: {update.update_id}")
-            await app.process_update(update)
-            return Response("OK", status=200)
+            await app.update_queue.put(update)
+            return web.Response(text="OK")
         else:
             logger.warning("Invalid update received")
-            return Response("Invalid update", status=400)
+            return web.Response(text="Invalid update", status=400)
     except Exception as e:
         logger.error(f"Webhook processing error: {e}")
-        return Response(f"Error: {e}", status=500)
+        return web.Response(text=f"Error: {e}", status=500)
+
+# aiohttp-сервер работает в том же event loop, что и PTB
+web_app = web.Application()
+web_app.router.add_get("/", home)
+web_app.router.add_post("/webhook", webhook)
 
 # ========================
 # ХРАНИЛИЩЕ ДЕДУПЛИКАЦИИ
 # ========================
+# Таблица posted без скрытого rowid: строки лежат прямо в B-дереве первичного ключа url
+POSTED_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        url TEXT PRIMARY KEY,
+        source TEXT,
+        created_at TEXT
+    ) WITHOUT ROWID
+"""
+
+def migrate_posted_without_rowid():
+    """
+    Однократно перестраивает старую таблицу posted в формат WITHOUT ROWID.
+    Вызывается из init_db под db_lock.
+    """
+    logger.info("Migrating posted table to WITHOUT ROWID")
+    db.execute("BEGIN")
+    try:
+        db.execute("DROP TABLE IF EXISTS posted_new")
+        db.execute(POSTED_TABLE_SQL.format(name="posted_new"))
+        db.execute("INSERT INTO posted_new (url, source, created_at) SELECT url, source, created_at FROM posted")
+        db.execute("DROP TABLE posted")
+        db.execute("ALTER TABLE posted_new RENAME TO posted")
+        db.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("VACUUM")
+
 def init_db():
     """
-    Создаёт SQLite-базу для хранения уже опубликованных URL.
+    Создаёт таблицы для хранения уже опубликованных URL и кэша og:image.
+    """
+    with db_lock:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        exists = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posted'").fetchone()
+        if exists and version < DB_SCHEMA_VERSION:
+            migrate_posted_without_rowid()
+        db.execute(POSTED_TABLE_SQL.format(name="posted"))
+        db.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_posted_created ON posted(created_at)")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS og_cache (
+                url TEXT PRIMARY KEY,
+                image TEXT,
+                fetched_at TEXT
+            )
+            """
+        )
+        db.execute("ANALYZE")
+    load_posted_urls()
+
+def load_posted_urls():
+    """
+    Заполняет posted_urls содержимым таблицы posted.
+    """
+    with db_lock:
+        urls = {row[0] for row in db.execute("SELECT url FROM posted")}
+    posted_urls.clear()
+    posted_urls.update(urls)
+
+def prune_posted():
+    """
+    Удаляет записи старше POSTED_RETENTION_DAYS, чтобы таблица не росла бесконечно.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=POSTED_RETENTION_DAYS)).isoformat()
+    with db_lock:
+        cur = db.execute("DELETE FROM posted WHERE created_at < ?", (cutoff,))
+    if cur.rowcount:
+        logger.info(f"Pruned {cur.rowcount} old posted URLs")
+        load_posted_urls()
+
+def prune_og_cache():
+    """
+    Удаляет из кэша og:image записи старше OG_CACHE_TTL_DAYS.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS posted (
-            url TEXT PRIMARY KEY,
-            source TEXT,
-            created_at TEXT
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=OG_CACHE_TTL_DAYS)).isoformat()
+    with db_lock:
+        db.execute("DELETE FROM og_cache WHERE fetched_at < ?", (cutoff,))
+
+def load_og_image(url: str) -> Tuple[bool, Optional[str]]:
+    """
+    Ищет og:image в постоянном кэше. Возвращает (найдено ли, картинка).
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=OG_CACHE_TTL_DAYS)).isoformat()
+    with db_lock:
+        row = db.execute(
+            "SELECT image FROM og_cache WHERE url = ? AND fetched_at >= ?", (url, cutoff)
+        ).fetchone()
+    if row is None:
+        return False, None
+    return True, row[0]
+
+def save_og_image(url: str, image: Optional[str]):
+    """
+    Сохраняет og:image (или его отсутствие) в постоянный кэш.
+    """
+    with db_lock:
+        db.execute(
+            "INSERT OR REPLACE INTO og_cache (url, image, fetched_at) VALUES (?, ?, ?)",
+            (url, image, datetime.now(timezone.utc).isoformat()),
         )
-        """
-    )
-    conn.commit()
-    conn.close()
 
-def already_posted(url: str) -> bool:
+def filter_unposted(items: List[Dict]) -> List[Dict]:
     """
-    Проверяет, публиковался ли URL ранее.
+    Возвращает только новости, которые ещё не публиковались.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM posted WHERE url = ?", (url,))
-    row = cur.fetchone()
-    conn.close()
-    return row is not None
+    return [it for it in items if it["link"] not in posted_urls]
 
 def mark_posted(url: str, source: str):
     """
     Отмечает URL как опубликованный.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO posted (url, source, created_at) VALUES (?, ?, ?)",
-        (url, source, datetime.now(timezone.utc).isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with db_lock:
+        posted_insert.execute(
+            "INSERT OR IGNORE INTO posted (url, source, created_at) VALUES (?, ?, ?)",
+            (url, source, datetime.now(timezone.utc).isoformat()),
+        )
+    posted_urls.add(url)
 
 # ========================
 # УТИЛИТЫ
@@ -140,37 +268,102 @@ def same_host(url: str, host_tail: str) -> bool:
     """
     Проверяет, принадлежит ли URL указанному домену.
     """
-    try:
-        return urlparse(url).netloc.endswith(host_tail)
-    except Exception:
-        return False
+    # Строковая проверка без urlparse: хост — третья часть "scheme://host/..."
+    parts = url.split("/", 3)
+    return len(parts) > 2 and url.startswith(("http://", "https://")) and parts[2].endswith(host_tail)
 
-def get_html(url: str) -> Optional[BeautifulSoup]:
+async def conditional_get(url: str, parse: Callable[[httpx.Response], Any]) -> Any:
+    """
+    Выполняет GET с If-None-Match/If-Modified-Since.
+    При ответе 304 возвращает ранее разобранный результат без повторного парсинга.
+    """
+    cached = http_cache.get(url)
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = await client.get(url, headers=headers)
+    if r.status_code == 304 and cached:
+        return cached["data"]
+    r.raise_for_status()
+
+    data = parse(r)
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if etag or last_modified:
+        http_cache[url] = {"etag": etag, "last_modified": last_modified, "data": data}
+    else:
+        http_cache.pop(url, None)
+    return data
+
+def parse_html(r: httpx.Response) -> lxml_html.HtmlElement:
+    """
+    Строит lxml-дерево из байтов ответа.
+    Кодировку берём из Content-Type, а если её там нет — её определяет lxml.
+    """
+    encoding = r.charset_encoding
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+    return lxml_html.fromstring(r.content, parser=parser)
+
+async def get_html(url: str) -> Optional[lxml_html.HtmlElement]:
     """
     Выполняет GET-запрос и возвращает распарсенный HTML.
     """
     try:
-        r = session.get(url, timeout=REQUEST_TIMEOUT)
-        r.raise_for_status()
-        return BeautifulSoup(r.text, "lxml")
+        return await conditional_get(url, parse_html)
     except Exception as e:
         logger.warning(f"GET failed {url}: {e}")
         return None
 
-def get_og_image(url: str) -> Optional[str]:
+async def fetch_og_image(url: str) -> Optional[str]:
     """
-    Извлекает URL картинки из meta og:image.
+    Потоково читает страницу только до конца <head> и извлекает og:image.
     """
-    try:
-        r = session.get(url, timeout=REQUEST_TIMEOUT)
+    og_image: Optional[str] = None
+    received = 0
+    async with client.stream("GET", url) as r:
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "lxml")
-        og = soup.find("meta", property="og:image:secure_url") or soup.find("meta", property="og:image")
-        if og and og.get("content"):
-            return og["content"].strip()
-    except Exception as e:
-        logger.warning(f"[og:image] {url} -> {e}")
-    return None
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding=r.charset_encoding)
+        async for chunk in r.aiter_bytes(4096):
+            parser.feed(chunk)
+            received += len(chunk)
+            for event, el in parser.read_events():
+                if event == "start" and el.tag == "meta":
+                    prop = el.get("property")
+                    content = (el.get("content") or "").strip()
+                    if content and prop == "og:image:secure_url":
+                        return content
+                    if content and prop == "og:image" and not og_image:
+                        og_image = content
+                elif (event == "end" and el.tag == "head") or (event == "start" and el.tag == "body"):
+                    return og_image
+            if received >= OG_MAX_BYTES:
+                break
+    return og_image
+
+async def get_og_image(url: str) -> Optional[str]:
+    """
+    Извлекает URL картинки из meta og:image.
+    Результат кэшируется в памяти и в SQLite (переживает перезапуск);
+    сетевые ошибки в кэш не попадают.
+    """
+    if url in og_image_cache:
+        return og_image_cache[url]
+    found, image = load_og_image(url)
+    if not found:
+        try:
+            image = await fetch_og_image(url)
+        except Exception as e:
+            logger.warning(f"[og:image] {url} -> {e}")
+            return None
+        save_og_image(url, image)
+    if len(og_image_cache) >= OG_CACHE_SIZE:
+        og_image_cache.pop(next(iter(og_image_cache)))
+    og_image_cache[url] = image
+    return image
 
 # ========================
 # ФИЛЬТРАЦИЯ ПОЛИТИЧЕСКИХ НОВОСТЕЙ
@@ -179,135 +372,179 @@ def is_political(title: str) -> bool:
     """
     Проверяет, содержит ли заголовок политические ключевые слова.
     """
-    title_lower = title.lower()
-    return any(keyword in title_lower for keyword in POLITICAL_KEYWORDS)
+    return POLITICAL_RE.search(title) is not None
 
 # ========================
 # ПАРСИНГ RSS
 # ========================
-def fetch_via_rss(rss_url: str) -> List[Dict]:
+def is_image_media(media) -> bool:
     """
-    Парсит RSS-ленту, возвращает список новостей.
+    Проверяет, что media:content / enclosure описывает картинку (если тип указан).
     """
-    items: List[Dict] = []
-    try:
-        feed = feedparser.parse(rss_url)
-        for e in feed.entries[:30]:
-            link = getattr(e, "link", None)
-            title = getattr(e, "title", None)
-            if not link or not title or is_political(title):
-                continue
-            summary = getattr(e, "summary", "")
-            items.append({"title": title.strip(), "link": link.strip(), "summary": (summary or "").strip()})
-    except Exception as e:
-        logger.warning(f"RSS error {rss_url}: {e}")
-    return items
+    medium = media.get("medium")
+    mime = media.get("type")
+    return (not medium or medium == "image") and (not mime or mime.startswith("image/"))
 
-# ========================
-# HTML-ПАРСЕРЫ
-# ========================
-def fetch_html_tourdom(list_url: str) -> List[Dict]:
+def rss_entry_image(e) -> Optional[str]:
     """
-    Парсер HTML для TourDom.
+    Достаёт URL картинки из media:content, media:thumbnail или enclosure записи RSS.
     """
-    soup = get_html(list_url)
-    if not soup:
-        return []
-    candidates: List[Dict] = []
+    for key in ("media_content", "media_thumbnail"):
+        for media in e.get(key) or []:
+            if media.get("url") and is_image_media(media):
+                return media["url"].strip()
+    for enclosure in e.get("enclosures") or []:
+        url = enclosure.get("href") or enclosure.get("url")
+        if url and is_image_media(enclosure):
+            return url.strip()
+    return None
 
-    for a in soup.select("article a[href], .news-list a[href], .news a[href]"):
-        href = a.get("href")
-        title = (a.get_text() or "").strip()
-        if not href or not title or is_political(title):
-            continue
-        link = absolute(list_url, href)
-        if "/news/" in link and same_host(link, "tourdom.ru") and 15 <= len(title) <= 160:
-            candidates.append({"title": title, "link": link, "summary": ""})
-
-    if not candidates:
-        for a in soup.select("a[href*='/news/']"):
-            href = a.get("href")
-            title = (a.get_text() or "").strip()
-            if not title or is_political(title):
-                continue
-            link = absolute(list_url, href)
-            if same_host(link, "tourdom.ru") and title and 15 <= len(title) <= 160:
-                candidates.append({"title": title, "link": link, "summary": ""})
-
-    seen, items = set(), []
-    for it in candidates:
-        if it["link"] in seen:
+def parse_rss(r: httpx.Response) -> List[Dict]:
+    """
+    Разбирает тело RSS-ленты в список новостей.
+    """
+    items: List[Dict] = []
+    feed = feedparser.parse(r.content)
+    for e in feed.entries[:30]:
+        link = e.get("link")
+        title = e.get("title")
+        if not link or not title or is_political(title):
             continue
-        seen.add(it["link"])
-        t = it["title"].lower()
-        if t not in {"новости", "читать далее", "ещё"}:
-            items.append(it)
-    return items[:25]
+        summary = e.get("summary") or e.get("description") or ""
+        item = {"title": title.strip(), "link": link.strip(), "summary": (summary or "").strip()}
+        # Если картинка есть в самой ленте, og:image со страницы не понадобится
+        image = rss_entry_image(e)
+        if image:
+            item["image"] = image
+        items.append(item)
+    return items
 
-def fetch_html_tourister(list_url: str) -> List[Dict]:
+async def fetch_via_rss(rss_url: str) -> List[Dict]:
     """
-    Парсер HTML для Tourister.
+    Парсит RSS-ленту, возвращает список новостей.
     """
-    soup = get_html(list_url)
-    if not soup:
+    try:
+        # Тело ленты скачиваем сами через общий клиент (keep-alive, сжатие)
+        return await conditional_get(rss_url, parse_rss)
+    except Exception as e:
+        logger.warning(f"RSS error {rss_url}: {e}")
         return []
-    candidates: List[Dict] = []
 
-    for a in soup.select("a[href*='/publications/']"):
-        href = a.get("href")
-        title = (a.get_text() or "").strip()
-        if not href or not title or is_political(title):
-            continue
-        link = absolute(list_url, href)
-        if same_host(link, "tourister.ru") and "/publications/" in link and 15 <= len(title) <= 160:
-            candidates.append({"title": title, "link": link, "summary": ""})
-
-    seen, items = set(), []
-    for it in candidates:
-        if it["link"] in seen:
-            continue
-        seen.add(it["link"])
-        t = it["title"].lower()
-        if t not in {"новости", "читать далее", "далее", "подробнее"}:
-            items.append(it)
-    return items[:25]
-
-def fetch_via_html(source: Dict) -> List[Dict]:
+# ========================
+# HTML-ПАРСЕРЫ
+# ========================
+def _has_class(name: str) -> str:
+    """
+    XPath-условие на наличие CSS-класса (аналог селектора .name).
     """
-    Выбирает подходящий HTML-парсер по домену.
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# XPath-выражения компилируются один раз при импорте
+XP_TOURDOM_NEWS = etree.XPath(
+    f"//article//a[@href] | //*[{_has_class('news-list')}]//a[@href] | //*[{_has_class('news')}]//a[@href]"
+)
+XP_TOURDOM_FALLBACK = etree.XPath("//a[contains(@href, '/news/')]")
+XP_TOURISTER_PUBLICATIONS = etree.XPath("//a[contains(@href, '/publications/')]")
+XP_ARTICLE_LINKS = etree.XPath("//article//a[@href]")
+
+# Служебные подписи ссылок, которые не являются заголовками новостей
+TOURDOM_SKIP = frozenset({"новости", "читать далее", "ещё"})
+TOURISTER_SKIP = frozenset({"новости", "читать далее", "далее", "подробнее"})
+
+def make_html_parser(host_tail: str, xpaths: Tuple[etree.XPath, ...], skip: frozenset, path_needle: str):
+    """
+    Собирает специализированный парсер списка новостей для одного сайта.
+    XPath-выражения пробуются по очереди, пока одно из них не даст новости.
+    """
+    async def parser(list_url: str) -> List[Dict]:
+        tree = await get_html(list_url)
+        if tree is None:
+            return []
+        seen: set = set()
+        items: List[Dict] = []
+        # Локальные имена во внутренних циклах быстрее глобальных
+        _abs, _same, _isp = absolute, same_host, is_political
+
+        # Дубликаты отсекаются до извлечения текста, после 25 новостей — выходим.
+        # Ссылка попадает в seen только после принятия, чтобы картинка-ссылка без текста
+        # не закрывала дорогу заголовку на ту же новость.
+        for xp in xpaths:
+            for a in xp(tree):
+                href = a.get("href")
+                if not href:
+                    continue
+                link = _abs(list_url, href)
+                if link in seen or path_needle not in link or not _same(link, host_tail):
+                    continue
+                title = (a.text_content() or "").strip()
+                if not (15 <= len(title) <= 160) or title.lower() in skip or _isp(title):
+                    continue
+                seen.add(link)
+                items.append({"title": title, "link": link, "summary": ""})
+                if len(items) >= 25:
+                    return items
+            if items:
+                break
+        return items
+
+    return parser
+
+# Специализированные парсеры по имени источника
+HTML_PARSERS = {
+    "TourDom": make_html_parser("tourdom.ru", (XP_TOURDOM_NEWS, XP_TOURDOM_FALLBACK), TOURDOM_SKIP, "/news/"),
+    "Tourister": make_html_parser("tourister.ru", (XP_TOURISTER_PUBLICATIONS,), TOURISTER_SKIP, "/publications/"),
+}
+
+async def fetch_via_html(source: Dict) -> List[Dict]:
+    """
+    Выбирает подходящий HTML-парсер по источнику.
     """
     url = source["html"]
-    host = urlparse(url).netloc
-    if "tourdom.ru" in host:
-        return fetch_html_tourdom(url)
-    if "tourister.ru" in host:
-        return fetch_html_tourister(url)
-
-    soup = get_html(url)
-    if not soup:
+    parser = HTML_PARSERS.get(source["name"])
+    if parser:
+        return await parser(url)
+
+    tree = await get_html(url)
+    if tree is None:
         return []
     items: List[Dict] = []
-    for a in soup.select("article a[href]"):
-        title = (a.get_text() or "").strip()
+    for a in XP_ARTICLE_LINKS(tree):
+        title = (a.text_content() or "").strip()
         href = a.get("href")
         if not title or not href or is_political(title):
             continue
         items.append({"title": title, "link": absolute(url, href), "summary": ""})
     return items[:20]
 
-def fetch_source_items(source: Dict) -> List[Dict]:
+async def fetch_source_items(source: Dict) -> List[Dict]:
     """
     Пытается получить новости через RSS, при неудаче — через HTML.
     """
     if source.get("rss"):
-        items = fetch_via_rss(source["rss"])
+        items = await fetch_via_rss(source["rss"])
         if items:
             return items
-    return fetch_via_html(source)
+    return await fetch_via_html(source)
 
 # ========================
 # ОТПРАВКА В ТЕЛЕГРАМ
 # ========================
+async def try_send_photo(context: ContextTypes.DEFAULT_TYPE, photo: str, caption: str, link: str) -> bool:
+    """
+    Отправляет фото с подписью. Возвращает False, если Telegram отверг картинку.
+    """
+    try:
+        await context.bot.send_photo(
+            chat_id=CHANNEL_ID,
+            photo=photo,
+            caption=caption,
+            parse_mode=ParseMode.HTML,
+        )
+        return True
+    except BadRequest as e:
+        logger.warning(f"Photo rejected for {link} ({photo}): {e}")
+        return False
+
 async def post_news(context: ContextTypes.DEFAULT_TYPE, item: Dict, source_name: str):
     """
     Отправляет новость в канал с картинкой и HTML-подписью.
@@ -317,11 +554,13 @@ async def post_news(context: ContextTypes.DEFAULT_TYPE, item: Dict, source_name:
     link = item["link"].strip()
     summary = (item.get("summary") or "").strip()
 
-    image = get_og_image(link)
+    # Картинка могла быть получена заранее в check_sources_job
+    image = item["image"] if "image" in item else await get_og_image(link)
 
     caption_parts = [f"<b>{title}</b>"]
     if summary:
-        clean = BeautifulSoup(summary, "lxml").get_text(" ", strip=True)
+        # Анонсы короткие: теги срезаем регуляркой, без построения дерева
+        clean = " ".join(html.unescape(TAG_RE.sub(" ", summary)).split())
         if len(clean) > 300:
             clean = clean[:297] + "…"
         caption_parts.append(clean)
@@ -329,14 +568,15 @@ async def post_news(context: ContextTypes.DEFAULT_TYPE, item: Dict, source_name:
     caption = "\n".join(caption_parts)
 
     try:
+        sent = False
         if image:
-            await context.bot.send_photo(
-                chat_id=CHANNEL_ID,
-                photo=image,
-                caption=caption,
-                parse_mode=ParseMode.HTML,
-            )
-        else:
+            sent = await try_send_photo(context, image, caption, link)
+            if not sent:
+                # Картинку (например, из ленты) отвергли — пробуем og:image, затем текст
+                og_image = await get_og_image(link)
+                if og_image and og_image != image:
+                    sent = await try_send_photo(context, og_image, caption, link)
+        if not sent:
             await context.bot.send_message(
                 chat_id=CHANNEL_ID,
                 text=caption,
@@ -357,12 +597,33 @@ async def check_sources_job(context: ContextTypes.DEFAULT_TYPE):
     Периодически проверяет источники, публикует новые новости.
     """
     logger.info("Checking sources...")
-    for src in SOURCES:
-        await asyncio.sleep(random.uniform(0.5, 1.5))
-        items = fetch_source_items(src)
-        new_items = [it for it in items if not already_posted(it["link"])]
-        for it in reversed(new_items[-5:]):
-            await post_news(context, it, src["name"])
+    prune_posted()
+    prune_og_cache()
+    # Источники опрашиваются параллельно
+    results = await asyncio.gather(*(fetch_source_items(src) for src in SOURCES))
+
+    # Одна и та же ссылка может прийти из разных источников или дважды из одной ленты
+    batches = []
+    scheduled: set = set()
+    for src, items in zip(SOURCES, results):
+        unique: Dict[str, Dict] = {}
+        for it in filter_unposted(items):
+            if it["link"] not in scheduled:
+                unique.setdefault(it["link"], it)
+        batch = list(unique.values())[-5:]
+        scheduled.update(it["link"] for it in batch)
+        batches.append((src["name"], list(reversed(batch))))
+
+    # Недостающие картинки для новых новостей запрашиваем параллельно
+    pending = [it for _, batch in batches for it in batch if not it.get("image")]
+    images = await asyncio.gather(*(get_og_image(it["link"]) for it in pending))
+    for it, image in zip(pending, images):
+        it["image"] = image
+
+    # Публикуем последовательно, чтобы сохранить порядок в канале
+    for source_name, batch in batches:
+        for it in batch:
+            await post_news(context, it, source_name)
 
 # ========================
 # КОМАНДЫ
@@ -397,7 +658,7 @@ async def main():
     """
     Точка входа: настраивает webhook, команды и периодические задачи.
     """
-    global app
+    global app, web_runner
     if not BOT_TOKEN:
         logger.error("BOT_TOKEN not set")
         raise SystemExit("❌ Укажите BOT_TOKEN в переменной окружения.")
@@ -453,15 +714,28 @@ async def main():
         logger.error(f"Failed to initialize application: {e}")
         raise
 
-    # Запускаем Flask-сервер
-    logger.info(f"Starting Flask server on port {PORT}")
-    flask_app.run(host="0.0.0.0", port=PORT, debug=False)
+    # Запускаем HTTP-сервер для вебхука и healthcheck
+    web_runner = web.AppRunner(web_app)
+    await web_runner.setup()
+    await web.TCPSite(web_runner, "0.0.0.0", PORT).start()
+    logger.info(f"HTTP server started on port {PORT}")
+
+    # Ждём SIGTERM/SIGINT без периодических пробуждений
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+    await stop_event.wait()
+    logger.info("Получен сигнал завершения.")
+    await stop()
 
 async def stop():
     """
     Корректное завершение работы приложения.
     """
     global app
+    if web_runner:
+        await web_runner.cleanup()
     try:
         if app and app.running:
             await app.stop()
@@ -471,6 +745,7 @@ async def stop():
             logger.warning("Приложение не запущено, пропускаем остановку.")
     except Exception as e:
         logger.error(f"Ошибка при остановке приложения: {e}")
+    await client.aclose()
 
 if __name__ == "__main__":
     loop = asyncio.new_event_loop()